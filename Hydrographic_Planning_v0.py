@@ -1,24 +1,79 @@
 import streamlit as st
 import datetime
-import pandas as pd
-import plotly.graph_objects as go
+import math
+import re
 import json
 from uuid import uuid4
 from io import BytesIO
-from typing import List, Dict, Optional
+from string import Template
+from collections import Counter, defaultdict
+from functools import cached_property
+from types import MappingProxyType
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, DefaultDict, List, Dict, Optional, Set, Tuple
+
+try:
+    import orjson  # much faster JSON encode/decode for export and import
+except ImportError:
+    orjson = None
+
+# pandas and plotly are imported where they are used (Excel I/O and the
+# Gantt), so a cold start that never reaches those paths skips loading them
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
 
 # ────────────────────────────────────────────────────────────────────────────────
 # SESSION STATE INITIALIZATION
 # ────────────────────────────────────────────────────────────────────────────────
 def init_session_state():
     if "projects" not in st.session_state:
-        st.session_state["projects"] = []  # List of Project objects
+        st.session_state["projects"] = {}  # project_id → Project (insertion-ordered)
     if "current_project_id" not in st.session_state:
         st.session_state["current_project_id"] = None
     if "editing_vessel" not in st.session_state:
         st.session_state["editing_vessel"] = None  # vessel_id being edited
     if "editing_task" not in st.session_state:
         st.session_state["editing_task"] = None    # task_id being edited
+    if "state_version" not in st.session_state:
+        # Bumped on every data mutation; cheap cache key for derived views
+        st.session_state["state_version"] = 0
+    if "timeline_segments" not in st.session_state:
+        st.session_state["timeline_segments"] = {}  # Gantt rows per vessel signature
+    if "session_key" not in st.session_state:
+        # Keeps cache keys from colliding across browser sessions
+        st.session_state["session_key"] = str(uuid4())
+    if "id_counters" not in st.session_state:
+        # Last id handed out per entity prefix (v = vessel, t = task, p = project)
+        st.session_state["id_counters"] = {"v": 0, "t": 0, "p": 0}
+
+
+def bump_state_version():
+    st.session_state["state_version"] += 1
+
+
+def state_key() -> Tuple[str, int]:
+    return st.session_state["session_key"], st.session_state["state_version"]
+
+
+# Session-local ids ("v_12") are far cheaper than a uuid4 per new entity.
+# Counters live in session state because the module re-runs on every rerun.
+ID_PATTERN = re.compile(r"([vtp])_(\d+)")
+
+
+def next_id(prefix: str) -> str:
+    counters = st.session_state["id_counters"]
+    counters[prefix] += 1
+    return f"{prefix}_{counters[prefix]}"
+
+
+def reserve_id(entity_id):
+    # Move the counter past an id loaded from a file so new ids can't clash;
+    # ids that aren't strings (numeric JSON ids) can't collide with ours
+    m = ID_PATTERN.fullmatch(entity_id) if isinstance(entity_id, str) else None
+    if m:
+        counters = st.session_state["id_counters"]
+        counters[m[1]] = max(counters[m[1]], int(m[2]))
 
 init_session_state()
 
@@ -26,8 +81,14 @@ init_session_state()
 # CONSTANTS & COLOR_MAP for Gantt
 # ────────────────────────────────────────────────────────────────────────────────
 DEFAULT_SURVEY_SPEED = 5.0  # knots
-
-COLOR_MAP = {
+LIST_PAGE_SIZE = 25         # vessel/task cards rendered per page
+SELECT_MAX_OPTIONS = 50     # cap on options shown in a searchable selectbox
+GANTT_MAX_HEIGHT = 2000     # px; keeps the Gantt bounded for large fleets
+GANTT_DATE_PAD = datetime.timedelta(days=3)  # lane margin either side of the bars
+GANTT_LABEL_MAX_BARS = 500  # above this, bars drop their in-bar text labels
+
+# Read-only view: the table is shared module state and is never edited at runtime
+COLOR_MAP = MappingProxyType({
     "Survey": "#2E86AB",
     "Maintenance": "#A23B72",
     "Weather": "#3B1F2B",
@@ -37,7 +98,29 @@ COLOR_MAP = {
     "Deployment": "#6A894A",
     "Recovery": "#7D3C98",
     "Other": "#6B7280",
-}
+})
+# Frozen (label, hex) pairs; fixes the category order of the Gantt "Type" column
+COLOR_MAP_TUPLE = tuple(COLOR_MAP.items())
+# Parallel tuples compiled once: the known task types and their bar colors
+TASK_TYPES = tuple(label for label, _ in COLOR_MAP_TUPLE)
+TYPE_COLORS = tuple(hex_color for _, hex_color in COLOR_MAP_TUPLE)
+# Task-type selectbox support: option → index, and the types that are not
+# the free-text “Other” (a task whose type is outside this set is custom)
+TASK_TYPE_INDEX = {t: i for i, t in enumerate(TASK_TYPES)}
+PRESET_TASK_TYPES = frozenset(TASK_TYPES) - {"Other"}
+
+# Canonical empty Gantt frame, built once and returned as-is when there is
+# nothing to plot
+@st.cache_resource
+def empty_timeline_df() -> "pd.DataFrame":
+    import pandas as pd
+    return pd.DataFrame({
+        "Task": pd.Series(dtype="object"),
+        "Start": pd.Series(dtype="datetime64[ns]"),
+        "Finish": pd.Series(dtype="datetime64[ns]"),
+        "Resource": pd.Series(dtype="category"),
+        "Type": pd.Series(dtype="category"),
+    })
 
 # ────────────────────────────────────────────────────────────────────────────────
 # INJECT CUSTOM CSS (button/text color, white “No…” messages, etc.)
@@ -48,8 +131,7 @@ st.set_page_config(
     page_icon="🌊"
 )
 
-st.markdown(
-    """
+APP_CSS = """
     <link rel="stylesheet"
           href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0-beta3/css/all.min.css">
     <style>
@@ -186,14 +268,44 @@ st.markdown(
             fill: #0B1D3A !important;
         }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+
+
+@st.cache_resource
+def app_css() -> str:
+    # Built once per server process and shared by every session and rerun:
+    # drop the CSS comments and indentation so each rerun ships a smaller blob
+    css = re.sub(r"/\*.*?\*/", "", APP_CSS, flags=re.S)
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+
+st.markdown(app_css(), unsafe_allow_html=True)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # DATA MODELS
 # ────────────────────────────────────────────────────────────────────────────────
+def parse_date(value) -> datetime.date:
+    # Exports write ISO dates, which the C-level fromisoformat parses directly;
+    # anything else (Excel timestamps, legacy formats) goes through pandas.
+    # Plain dates (e.g. an import column parsed up front) pass straight through.
+    if type(value) is datetime.date:
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+    import pandas as pd
+    return pd.to_datetime(value).date()
+
+
 class Vessel:
+    # __dict__ stays only to hold the cached_property results below
+    __slots__ = (
+        "id", "name", "vessel_km", "start_date",
+        "transit_days", "weather_days", "maintenance_days", "_as_dict", "__dict__"
+    )
+
     def __init__(
         self,
         name: str,
@@ -207,7 +319,7 @@ class Vessel:
         maintenance_unit: str,
         id: Optional[str] = None
     ):
-        self.id = id or str(uuid4())
+        self.id = id or next_id("v")
         self.name = name
         self.vessel_km = vessel_km
         self.start_date = start_date
@@ -216,37 +328,65 @@ class Vessel:
         self.transit_days = self._convert_to_days(transit, transit_unit)
         self.weather_days = self._convert_to_days(weather, weather_unit)
         self.maintenance_days = self._convert_to_days(maintenance, maintenance_unit)
+        self._as_dict = None  # to_dict() result, built on first export
 
+    # Derived schedule fields are computed on first access and then kept;
+    # a Vessel is never mutated in place (edits build a new one).
+    @cached_property
+    def survey_days(self) -> float:
         # Survey days = (vessel_km) / (speed * 24)
-        self.survey_days = round(self.vessel_km / (DEFAULT_SURVEY_SPEED * 24), 2)
-        self.total_days = round(
+        return round(self.vessel_km / (DEFAULT_SURVEY_SPEED * 24), 2)
+
+    @cached_property
+    def total_days(self) -> float:
+        return round(
             self.survey_days + self.transit_days + self.weather_days + self.maintenance_days, 2
         )
-        self.end_date = self.start_date + datetime.timedelta(days=self.total_days)
+
+    @cached_property
+    def end_date(self) -> datetime.date:
+        # Whole-day offset on the ordinal; int() drops the fraction exactly as
+        # date + timedelta(days=total_days) did, without building a timedelta
+        return datetime.date.fromordinal(self.start_date.toordinal() + int(self.total_days))
+
+    def schedule_inputs(self) -> tuple:
+        # Everything the derived fields depend on, for cheap change detection
+        return (
+            self.name, self.vessel_km, self.start_date,
+            self.transit_days, self.weather_days, self.maintenance_days
+        )
 
     def _convert_to_days(self, val: float, unit: str) -> float:
         return round(val / 24, 2) if unit == "hours" else val
 
     def to_dict(self) -> Dict:
+        # Built once and reused by later exports (edits replace the Vessel);
+        # callers must treat the returned dict as read-only
+        if self._as_dict is None:
+            self._as_dict = self._build_dict()
+        return self._as_dict
+
+    def _build_dict(self) -> Dict:
         return {
             "id": self.id,
             "name": self.name,
             "vessel_km": self.vessel_km,
-            "start_date": str(self.start_date),
+            "start_date": self.start_date.isoformat(),
             "transit_days": self.transit_days,
             "weather_days": self.weather_days,
             "maintenance_days": self.maintenance_days,
             "survey_days": self.survey_days,
             "total_days": self.total_days,
-            "end_date": str(self.end_date),
+            "end_date": self.end_date.isoformat(),
         }
 
     @staticmethod
     def from_dict(d: Dict) -> "Vessel":
+        reserve_id(d["id"])
         v = Vessel(
             name=d["name"],
             vessel_km=float(d["vessel_km"]),
-            start_date=pd.to_datetime(d["start_date"]).date(),
+            start_date=parse_date(d["start_date"]),
             transit=float(d["transit_days"]),
             transit_unit="days",
             weather=float(d["weather_days"]),
@@ -259,6 +399,10 @@ class Vessel:
 
 
 class Task:
+    __slots__ = (
+        "id", "name", "task_type", "start_date", "end_date", "vessel_id", "pause_survey", "_as_dict"
+    )
+
     def __init__(
         self,
         name: str,
@@ -269,32 +413,47 @@ class Task:
         pause_survey: bool = False,
         id: Optional[str] = None
     ):
-        self.id = id or str(uuid4())
+        self.id = id or next_id("t")
         self.name = name
         self.task_type = task_type
         self.start_date = start_date
         self.end_date = end_date
         self.vessel_id = vessel_id
         self.pause_survey = pause_survey
+        self._as_dict = None  # to_dict() result, built on first export
+
+    def schedule_inputs(self) -> tuple:
+        # Every editable field, for cheap change detection
+        return (
+            self.name, self.task_type, self.start_date, self.end_date,
+            self.vessel_id, self.pause_survey
+        )
 
     def to_dict(self) -> Dict:
+        # Same as Vessel.to_dict: built once, read-only for callers
+        if self._as_dict is None:
+            self._as_dict = self._build_dict()
+        return self._as_dict
+
+    def _build_dict(self) -> Dict:
         return {
             "id": self.id,
             "name": self.name,
             "task_type": self.task_type,
-            "start_date": str(self.start_date),
-            "end_date": str(self.end_date),
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
             "vessel_id": self.vessel_id,
             "pause_survey": self.pause_survey,
         }
 
     @staticmethod
     def from_dict(d: Dict) -> "Task":
+        reserve_id(d["id"])
         t = Task(
             name=d["name"],
             task_type=d["task_type"],
-            start_date=pd.to_datetime(d["start_date"]).date(),
-            end_date=pd.to_datetime(d["end_date"]).date(),
+            start_date=parse_date(d["start_date"]),
+            end_date=parse_date(d["end_date"]),
             vessel_id=d["vessel_id"],
             pause_survey=bool(d["pause_survey"]),
             id=d["id"]
@@ -303,6 +462,8 @@ class Task:
 
 
 class Project:
+    __slots__ = ("id", "name", "total_line_km", "infill_pct", "vessels", "tasks", "tasks_by_vessel")
+
     def __init__(
         self,
         name: str,
@@ -310,12 +471,35 @@ class Project:
         infill_pct: float,
         id: Optional[str] = None
     ):
-        self.id = id or str(uuid4())
+        self.id = id or next_id("p")
         self.name = name
         self.total_line_km = total_line_km
         self.infill_pct = infill_pct
-        self.vessels: List[Vessel] = []
-        self.tasks: List[Task] = []
+        # Keyed by id (insertion-ordered) so edits/deletes are O(1)
+        self.vessels: Dict[str, Vessel] = {}
+        self.tasks: Dict[str, Task] = {}
+        # vessel_id → ids of the tasks assigned to it, for cascade deletes
+        self.tasks_by_vessel: DefaultDict[str, Set[str]] = defaultdict(set)
+
+    def put_task(self, t: Task):
+        # Add a task, or replace the one with the same id
+        old = self.tasks.get(t.id)
+        if old is not None and old.vessel_id is not None:
+            self.tasks_by_vessel[old.vessel_id].discard(t.id)
+        self.tasks[t.id] = t
+        if t.vessel_id is not None:
+            self.tasks_by_vessel[t.vessel_id].add(t.id)
+
+    def remove_task(self, task_id: str):
+        t = self.tasks.pop(task_id, None)
+        if t is not None and t.vessel_id is not None:
+            self.tasks_by_vessel[t.vessel_id].discard(task_id)
+
+    def remove_vessel(self, vessel_id: str):
+        # Also removes the tasks assigned to this vessel
+        self.vessels.pop(vessel_id, None)
+        for tid in self.tasks_by_vessel.pop(vessel_id, ()):
+            self.tasks.pop(tid, None)
 
     def to_dict(self) -> Dict:
         return {
@@ -323,20 +507,24 @@ class Project:
             "name": self.name,
             "total_line_km": self.total_line_km,
             "infill_pct": self.infill_pct,
-            "vessels": [v.to_dict() for v in self.vessels],
-            "tasks": [t.to_dict() for t in self.tasks],
+            "vessels": [v.to_dict() for v in self.vessels.values()],
+            "tasks": [t.to_dict() for t in self.tasks.values()],
         }
 
     @staticmethod
     def from_dict(d: Dict) -> "Project":
+        reserve_id(d["id"])
         p = Project(
             name=d["name"],
             total_line_km=float(d["total_line_km"]),
             infill_pct=float(d["infill_pct"]),
             id=d["id"]
         )
-        p.vessels = [Vessel.from_dict(v) for v in d.get("vessels", [])]
-        p.tasks = [Task.from_dict(t) for t in d.get("tasks", [])]
+        for vd in d.get("vessels", []):
+            v = Vessel.from_dict(vd)
+            p.vessels[v.id] = v
+        for td in d.get("tasks", []):
+            p.put_task(Task.from_dict(td))
         return p
 
 
@@ -347,31 +535,235 @@ def get_current_project() -> Optional[Project]:
     pid = st.session_state.get("current_project_id")
     if pid is None:
         return None
-    for p in st.session_state.get("projects", []):
-        if p.id == pid:
-            return p
-    return None
+    return st.session_state.get("projects", {}).get(pid)
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# HELPER: Render only one page of a long vessel/task list
+# ────────────────────────────────────────────────────────────────────────────────
+def paginate(items: List, key: str) -> List:
+    n_pages = math.ceil(len(items) / LIST_PAGE_SIZE)
+    if n_pages <= 1:
+        return items
+    # A delete can shrink the list below the remembered page; start over at 1
+    if st.session_state.get(key, 1) > n_pages:
+        del st.session_state[key]
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    return items[(page - 1) * LIST_PAGE_SIZE:page * LIST_PAGE_SIZE]
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# HELPER: Shared card markup for the vessel and task lists
+# ────────────────────────────────────────────────────────────────────────────────
+# Parsed once at import; each card is a single substitute() call
+VESSEL_CARD = Template(
+    '<div class="card"><h4><i class="fas fa-ship"></i> $name</h4>'
+    "<p><strong>Survey:</strong> $vessel_km km</p>"
+    "<p><strong>Schedule:</strong> $start_date &rarr; $end_date ($total_days days)</p>"
+    "<p><strong>Breakdown:</strong> Survey: $survey_days d | Transit: $transit_days d | "
+    "Weather: $weather_days d | Maint: $maintenance_days d</p></div>"
+)
+TASK_CARD = Template(
+    '<div class="card"><strong><i class="fas fa-tasks"></i> $name</strong> ($task_type)<br>'
+    "<small>$start_date &rarr; $end_date | Vessel: $vessel_name</small><br>$pause</div>"
+)
+PAUSE_LINE = "<small style='color:orange;'>⚠️ Pauses Survey</small>"
+
+
+# Card markup keyed on (session, state_version, project): a rerun with no data
+# change reuses the previous strings instead of re-formatting every card.
+@st.cache_data(show_spinner=False, max_entries=32)
+def vessel_cards_html(key: Tuple[str, int], project_id: str, _project: Project) -> Dict[str, str]:
+    return {
+        v.id: VESSEL_CARD.substitute(
+            name=v.name, vessel_km=v.vessel_km, start_date=v.start_date, end_date=v.end_date,
+            total_days=v.total_days, survey_days=v.survey_days, transit_days=v.transit_days,
+            weather_days=v.weather_days, maintenance_days=v.maintenance_days
+        )
+        for v in _project.vessels.values()
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def task_cards_html(key: Tuple[str, int], project_id: str, _project: Project) -> Dict[str, str]:
+    cards = {}
+    for t in _project.tasks.values():
+        v = _project.vessels.get(t.vessel_id)
+        cards[t.id] = TASK_CARD.substitute(
+            name=t.name, task_type=t.task_type, start_date=t.start_date, end_date=t.end_date,
+            vessel_name=v.name if v is not None else "Unassigned",
+            pause=PAUSE_LINE if t.pause_survey else ""
+        )
+    return cards
+
+
+# Selectbox option lists keyed the same way. cache_resource hands back the
+# same objects on a hit, so callers treat them as read-only.
+@st.cache_resource(show_spinner=False, max_entries=32)
+def project_name_index(key: Tuple[str, int], _projects: Dict[str, Project]) -> Tuple[List[str], Dict[str, str]]:
+    # name → id; with duplicate names the last project wins
+    return [p.name for p in _projects.values()], {p.name: p.id for p in _projects.values()}
+
+
+def unique_labels(labels: Dict) -> Dict:
+    # Streamlit maps a chosen selectbox label back to its option, so labels
+    # must be unique: any label shared by several options gets the id appended
+    counts = Counter(labels.values())
+    return {k: f"{label} ({k})" if counts[label] > 1 else label for k, label in labels.items()}
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def vessel_options(
+    key: Tuple[str, int], project_id: str, _project: Project
+) -> Tuple[Dict[Optional[str], str], Tuple[Optional[str], ...]]:
+    # Selectbox labels by id (None = unassigned) plus the ids in display order;
+    # shared by every vessel selector so a vessel reads the same everywhere
+    label_by_id = unique_labels(
+        {None: "Unassigned", **{vid: v.name for vid, v in _project.vessels.items()}}
+    )
+    return label_by_id, tuple(label_by_id)
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# HELPER: JSON bytes in/out (orjson when installed, stdlib json otherwise)
+# ────────────────────────────────────────────────────────────────────────────────
+def json_dumps(obj, pretty: bool = False) -> bytes:
+    # Compact by default: smaller files and a faster encode; pretty = 2-space indent
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# HELPER: Export payloads (pure functions of the projects, cached across reruns)
+# ────────────────────────────────────────────────────────────────────────────────
+@st.cache_data(show_spinner=False, max_entries=16)
+def export_to_json(key: Tuple[str, int], _projects: List[Project], pretty: bool = False) -> bytes:
+    # Keyed on the session's state version; _projects is not hashed, so a
+    # repeat export of unchanged data skips both to_dict and the encode.
+    # The bytes go to download_button as-is.
+    data_out = {"projects": [p.to_dict() for p in _projects]}
+    return json_dumps(data_out, pretty)
+
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl=3600)
+def export_to_excel(projects_json: bytes) -> bytes:
+    # Keyed on the JSON export, so an unchanged project set reuses the workbook.
+    # The cache is shared by every session, hence the entry cap and expiry.
+    proj_dicts = json_loads(projects_json)["projects"]
+    # Collect all three sheets column-wise in a single pass over the projects;
+    # the writers below consume the dict of lists directly.
+    # Vessel/task columns keep their to_dict order, with project_id last.
+    proj_cols: Dict[str, list] = {"project_id": [], "name": [], "total_line_km": [], "infill_pct": []}
+    vessel_cols: DefaultDict[str, list] = defaultdict(list)
+    task_cols: DefaultDict[str, list] = defaultdict(list)
+    for p in proj_dicts:
+        proj_cols["project_id"].append(p["id"])
+        proj_cols["name"].append(p["name"])
+        proj_cols["total_line_km"].append(p["total_line_km"])
+        proj_cols["infill_pct"].append(p["infill_pct"])
+        for vr in p["vessels"]:
+            for k, val in vr.items():
+                vessel_cols[k].append(val)
+            vessel_cols["project_id"].append(p["id"])
+        for tr in p["tasks"]:
+            for k, val in tr.items():
+                task_cols[k].append(val)
+            task_cols["project_id"].append(p["id"])
+
+    # Empty sheets are left out
+    sheets = [
+        (name, cols)
+        for name, cols in (("Projects", proj_cols), ("Vessels", vessel_cols), ("Tasks", task_cols))
+        if cols and next(iter(cols.values()))
+    ]
+
+    output = BytesIO()
+    if find_spec("xlsxwriter"):
+        import xlsxwriter
+        # Written row by row straight from the columns, with no DataFrame in
+        # between; constant_memory flushes each finished row to a temp file,
+        # so memory stays flat however many rows the export has
+        wb = xlsxwriter.Workbook(output, {"constant_memory": True, "nan_inf_to_errors": True})
+        header_fmt = wb.add_format({"bold": True})
+        for name, cols in sheets:
+            ws = wb.add_worksheet(name)
+            ws.write_row(0, 0, list(cols), header_fmt)
+            for r, row in enumerate(zip(*cols.values()), start=1):
+                ws.write_row(r, 0, row)
+        wb.close()
+    else:
+        # openpyxl is needed for import anyway, so it is the fallback writer
+        import pandas as pd
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            for name, cols in sheets:
+                pd.DataFrame(cols).to_excel(writer, sheet_name=name, index=False)
+
+    return output.getvalue()
+
+
+# Columns read back from each sheet on Excel import, with their dtypes. Ids and
+# names come in as str (so pandas skips inference and a name like "2024" stays
+# text); None leaves the column to pandas (dates are parsed per column later).
+EXCEL_IMPORT_COLUMNS = {
+    "Projects": {"project_id": str, "name": str, "total_line_km": float, "infill_pct": float},
+    "Vessels": {
+        "id": str, "project_id": str, "name": str, "vessel_km": float, "start_date": None,
+        "transit_days": float, "weather_days": float, "maintenance_days": float,
+    },
+    "Tasks": {
+        "id": str, "project_id": str, "name": str, "task_type": str,
+        "start_date": None, "end_date": None, "vessel_id": str, "pause_survey": None,
+    },
+}
+
+
+def read_import_sheet(xls: "pd.ExcelFile", sheet: str) -> "pd.DataFrame":
+    cols = EXCEL_IMPORT_COLUMNS[sheet]
+    return xls.parse(
+        sheet, usecols=list(cols), dtype={c: t for c, t in cols.items() if t is not None}
+    )
 
 
 # ────────────────────────────────────────────────────────────────────────────────
 # SECTION 1) PROJECT CREATION / SELECTION
 # ────────────────────────────────────────────────────────────────────────────────
+# One “today” per rerun, shared by every date default below
+today = datetime.date.today()
+
+# Page header and the first section header go out as a single markdown element
 st.markdown(
-    '<div class="stHeader"><h1><i class="fas fa-water"></i> Hydrographic Survey Estimator</h1></div>',
+    '<div class="stHeader"><h1><i class="fas fa-water"></i> Hydrographic Survey Estimator</h1></div>'
+    '<div class="section-header">1) Create / Select Project</div>',
     unsafe_allow_html=True
 )
 
-st.markdown('<div class="section-header">1) Create / Select Project</div>', unsafe_allow_html=True)
+# Bound once; st.session_state is a proxy, not a plain dict
+projects = st.session_state["projects"]
 
 col1, col2, col3 = st.columns([2, 2, 1])
 with col1:
-    project_names = [p.name for p in st.session_state.get("projects", [])]
+    # Rebuilt only when the session's state version moves
+    project_names, project_id_by_name = project_name_index(state_key(), projects)
+    cp = get_current_project()
+    if len(project_names) > SELECT_MAX_OPTIONS:
+        # Long project lists: narrow the dropdown with a search box
+        query = st.text_input("Search Projects", value="", key="project_search").strip().lower()
+        project_names = [n for n in project_names if query in n.lower()][:SELECT_MAX_OPTIONS]
+        if cp is not None and cp.name not in project_names:
+            project_names.insert(0, cp.name)
     project_options = ["➕ New Project"] + project_names
     idx = 0
-    if st.session_state.get("current_project_id") is not None:
-        cp = get_current_project()
-        if cp is not None and cp.name in project_names:
-            idx = project_names.index(cp.name) + 1
+    if cp is not None and cp.name in project_names:
+        idx = project_names.index(cp.name) + 1
 
     sel = st.selectbox(
         "Select Project",
@@ -382,35 +774,30 @@ with col1:
 
 with col2:
     if sel == "➕ New Project":
-        new_name = st.text_input("New Project Name", value="", placeholder="e.g. Gulf Survey 2025")
-        new_line_km_text = st.text_input("Total Line Km to Survey", value="0.00", placeholder="0.00")
-        new_infill_text = st.text_input("Infill %", value="0.00", placeholder="0.00")
-        if st.button("Create Project", key="create_project"):
-            # Convert text inputs to floats
-            try:
-                new_line_km = float(new_line_km_text)
-                new_infill = float(new_infill_text)
-            except ValueError:
-                st.error("Line Km and Infill % must be valid numbers.")
-                new_line_km = None
-                new_infill = None
-
-            if not new_name.strip():
-                st.error("Project name cannot be empty.")
-            elif new_line_km is None or new_line_km < 0:
-                st.error("Total Line Km to Survey must be ≥ 0.")
-            elif new_infill is None or not (0 <= new_infill <= 100):
-                st.error("Infill % must be between 0 and 100.")
-            else:
-                proj = Project(name=new_name.strip(), total_line_km=new_line_km, infill_pct=new_infill)
-                st.session_state["projects"].append(proj)
-                st.session_state["current_project_id"] = proj.id
+        # A form, so typing in these fields does not rerun the app until submit
+        with st.form("create_project_form"):
+            new_name = st.text_input("New Project Name", value="", placeholder="e.g. Gulf Survey 2025")
+            # number_input rejects non-numeric and out-of-range entries in the browser
+            new_line_km = st.number_input("Total Line Km to Survey", min_value=0.0, value=0.0, step=10.0, format="%.2f")
+            new_infill = st.number_input("Infill %", min_value=0.0, max_value=100.0, value=0.0, step=1.0, format="%.2f")
+            if st.form_submit_button("Create Project"):
+                errs = []
+                if not new_name.strip():
+                    errs.append("Project name cannot be empty.")
+
+                if errs:
+                    for e in errs:
+                        st.error(e)
+                else:
+                    proj = Project(name=new_name.strip(), total_line_km=new_line_km, infill_pct=new_infill)
+                    projects[proj.id] = proj
+                    st.session_state["current_project_id"] = proj.id
+                    bump_state_version()
     else:
         # User selected an existing project; store its ID
         chosen = sel
-        for p in st.session_state.get("projects", []):
-            if p.name == chosen:
-                st.session_state["current_project_id"] = p.id
+        if chosen in project_id_by_name:
+            st.session_state["current_project_id"] = project_id_by_name[chosen]
 
 with col3:
     if st.button("Clear Project", key="clear_project"):
@@ -441,12 +828,12 @@ with st.expander("🚢 Add New Vessel", expanded=False):
         colA, colB, colC = st.columns([3, 2, 1])
         with colA:
             vessel_name = st.text_input("Vessel Name*", placeholder="e.g. Orca Explorer")
-            vessel_km_text = st.text_input("Line Km for this Vessel*", value="0.00", placeholder="0.00")
-            start_date = st.date_input("Start Date*", value=datetime.date.today())
+            vessel_km = st.number_input("Line Km for this Vessel*", min_value=0.0, value=0.0, step=10.0, format="%.2f")
+            start_date = st.date_input("Start Date*", value=today)
         with colB:
-            transit_text = st.text_input("Transit Duration*", value="0.00", placeholder="0.00")
-            weather_text = st.text_input("Weather Downtime*", value="0.00", placeholder="0.00")
-            maintenance_text = st.text_input("Maintenance*", value="0.00", placeholder="0.00")
+            tr = st.number_input("Transit Duration*", min_value=0.0, value=0.0, step=1.0, format="%.2f")
+            wt = st.number_input("Weather Downtime*", min_value=0.0, value=0.0, step=1.0, format="%.2f")
+            mt = st.number_input("Maintenance*", min_value=0.0, value=0.0, step=1.0, format="%.2f")
         with colC:
             transit_unit = st.selectbox("Unit", ["days", "hours"], index=0, key="transit_unit")
             weather_unit = st.selectbox("", ["days", "hours"], index=0, key="weather_unit")
@@ -454,26 +841,12 @@ with st.expander("🚢 Add New Vessel", expanded=False):
 
         submitted = st.form_submit_button("Add Vessel")
         if submitted:
-            try:
-                vkm = float(vessel_km_text)
-                tr = float(transit_text)
-                wt = float(weather_text)
-                mt = float(maintenance_text)
-            except ValueError:
-                st.error("Line Km, Transit, Weather, and Maintenance must all be valid numbers.")
-                vkm = tr = wt = mt = None
-
             errs = []
             if not vessel_name.strip():
                 errs.append("Vessel name cannot be empty.")
-            if vkm is None or vkm <= 0:
+            # min_value only guarantees ≥ 0; Line Km must be strictly positive
+            if vessel_km <= 0:
                 errs.append("Line Km must be a positive number.")
-            if tr is None or tr < 0:
-                errs.append("Transit Duration must be ≥ 0.")
-            if wt is None or wt < 0:
-                errs.append("Weather Downtime must be ≥ 0.")
-            if mt is None or mt < 0:
-                errs.append("Maintenance must be ≥ 0.")
 
             if errs:
                 for e in errs:
@@ -481,7 +854,7 @@ with st.expander("🚢 Add New Vessel", expanded=False):
             else:
                 new_v = Vessel(
                     name=vessel_name.strip(),
-                    vessel_km=vkm,
+                    vessel_km=vessel_km,
                     start_date=start_date,
                     transit=tr,
                     transit_unit=transit_unit,
@@ -490,44 +863,48 @@ with st.expander("🚢 Add New Vessel", expanded=False):
                     maintenance=mt,
                     maintenance_unit=maintenance_unit
                 )
-                current_project.vessels.append(new_v)
+                current_project.vessels[new_v.id] = new_v
+                bump_state_version()
                 st.success(f"Vessel '{vessel_name.strip()}' added!")
     st.markdown('</div>', unsafe_allow_html=True)
 
 # — Display Existing Vessels
-for v in current_project.vessels:
-    with st.container():
-        c1, c2, c3 = st.columns([3, 1, 1])
-        with c1:
-            st.markdown(
-                f"""
-                <div class="card">
-                    <h4><i class="fas fa-ship"></i> {v.name}</h4>
-                    <p><strong>Survey:</strong> {v.vessel_km} km</p>
-                    <p><strong>Schedule:</strong> {v.start_date} &rarr; {v.end_date} ({v.total_days} days)</p>
-                    <p><strong>Breakdown:</strong> Survey: {v.survey_days} d |
-                      Transit: {v.transit_days} d |
-                      Weather: {v.weather_days} d |
-                      Maint: {v.maintenance_days} d
-                    </p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        with c2:
-            if st.button("✏️ Edit", key=f"edit_v_{v.id}"):
-                st.session_state["editing_vessel"] = v.id
-        with c3:
-            if st.button("🗑️ Delete", key=f"del_v_{v.id}"):
-                current_project.vessels = [x for x in current_project.vessels if x.id != v.id]
-                # Remove tasks assigned to this vessel
-                current_project.tasks = [t for t in current_project.tasks if t.vessel_id != v.id]
-                st.success(f"Deleted vessel '{v.name}'.")
+# One selector + Edit/Delete pair acts on the chosen vessel, instead of a
+# column layout and two buttons per card.
+page_vessels = paginate(list(current_project.vessels.values()), key="vessel_page")
+if page_vessels:
+    c1, c2, c3 = st.columns([3, 1, 1])
+    with c1:
+        sel_vid = st.selectbox(
+            "Vessel",
+            options=[v.id for v in page_vessels],
+            # Same labels as the task forms' vessel pickers
+            format_func=vessel_options(state_key(), current_project.id, current_project)[0].get,
+            key="vessel_action_select",
+            label_visibility="collapsed"
+        )
+    with c2:
+        if st.button("✏️ Edit", key="edit_vessel"):
+            st.session_state["editing_vessel"] = sel_vid
+    with c3:
+        if st.button("🗑️ Delete", key="delete_vessel"):
+            deleted_name = current_project.vessels[sel_vid].name
+            current_project.remove_vessel(sel_vid)
+            bump_state_version()
+            st.success(f"Deleted vessel '{deleted_name}'.")
+
+# The whole page of cards goes out as one markdown element
+vessel_cards = vessel_cards_html(state_key(), current_project.id, current_project)
+if vessel_cards:
+    st.markdown(
+        "".join(vessel_cards[v.id] for v in page_vessels if v.id in vessel_cards),  # skips a just-deleted vessel
+        unsafe_allow_html=True
+    )
 
 # — Edit Vessel Expander
 if st.session_state.get("editing_vessel"):
     edit_id = st.session_state["editing_vessel"]
-    to_edit = next((x for x in current_project.vessels if x.id == edit_id), None)
+    to_edit = current_project.vessels.get(edit_id)
     if to_edit is not None:
         with st.expander(f"✏️ Edit Vessel: {to_edit.name}", expanded=True):
             st.markdown('<div class="add-form-button">', unsafe_allow_html=True)
@@ -535,20 +912,22 @@ if st.session_state.get("editing_vessel"):
                 eA, eB, eC = st.columns([3, 2, 1])
                 with eA:
                     new_name = st.text_input("Vessel Name*", value=to_edit.name)
-                    new_km_text = st.text_input("Line Km*", value=str(to_edit.vessel_km))
+                    nkm = st.number_input(
+                        "Line Km*", min_value=0.0, value=float(to_edit.vessel_km), step=10.0, format="%.2f"
+                    )
                     new_start = st.date_input("Start Date*", value=to_edit.start_date)
                 with eB:
-                    new_transit_text = st.text_input(
-                        "Transit Duration*", value=str(to_edit.transit_days),
-                        key=f"et_{to_edit.id}_transit_text"
+                    ntr = st.number_input(
+                        "Transit Duration*", min_value=0.0, value=float(to_edit.transit_days), step=1.0, format="%.2f",
+                        key=f"et_{to_edit.id}_transit"
                     )
-                    new_weather_text = st.text_input(
-                        "Weather Downtime*", value=str(to_edit.weather_days),
-                        key=f"ew_{to_edit.id}_weather_text"
+                    nwt = st.number_input(
+                        "Weather Downtime*", min_value=0.0, value=float(to_edit.weather_days), step=1.0, format="%.2f",
+                        key=f"ew_{to_edit.id}_weather"
                     )
-                    new_maint_text = st.text_input(
-                        "Maintenance*", value=str(to_edit.maintenance_days),
-                        key=f"em_{to_edit.id}_maint_text"
+                    nmt = st.number_input(
+                        "Maintenance*", min_value=0.0, value=float(to_edit.maintenance_days), step=1.0, format="%.2f",
+                        key=f"em_{to_edit.id}_maint"
                     )
                 with eC:
                     new_transit_unit = st.selectbox(
@@ -566,26 +945,11 @@ if st.session_state.get("editing_vessel"):
 
                 update_button = st.form_submit_button("Update Vessel")
                 if update_button:
-                    try:
-                        nkm = float(new_km_text)
-                        ntr = float(new_transit_text)
-                        nwt = float(new_weather_text)
-                        nmt = float(new_maint_text)
-                    except ValueError:
-                        st.error("Line Km, Transit, Weather, and Maintenance must be valid numbers.")
-                        nkm = ntr = nwt = nmt = None
-
                     errs = []
                     if not new_name.strip():
                         errs.append("Vessel name cannot be empty.")
-                    if nkm is None or nkm <= 0:
+                    if nkm <= 0:
                         errs.append("Line Km must be a positive number.")
-                    if ntr is None or ntr < 0:
-                        errs.append("Transit Duration must be ≥ 0.")
-                    if nwt is None or nwt < 0:
-                        errs.append("Weather Downtime must be ≥ 0.")
-                    if nmt is None or nmt < 0:
-                        errs.append("Maintenance must be ≥ 0.")
 
                     if errs:
                         for e in errs:
@@ -603,10 +967,14 @@ if st.session_state.get("editing_vessel"):
                             maintenance_unit=new_maint_unit,
                             id=to_edit.id
                         )
-                        current_project.vessels = [
-                            x for x in current_project.vessels if x.id != to_edit.id
-                        ] + [updated_v]
-                        st.success(f"Vessel '{new_name.strip()}' updated!")
+                        # Submitting an unchanged form keeps the old object, so
+                        # the version (and every cache keyed on it) stays put
+                        if updated_v.schedule_inputs() != to_edit.schedule_inputs():
+                            current_project.vessels[to_edit.id] = updated_v
+                            bump_state_version()
+                            st.success(f"Vessel '{new_name.strip()}' updated!")
+                        else:
+                            st.info("No changes to save.")
                         st.session_state["editing_vessel"] = None
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -618,6 +986,10 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Vessel labels by id (None = unassigned), shared by the Add Task and Edit Task
+# forms below; the selectboxes take the plain ids as options
+vessel_label_by_id, vessel_option_ids = vessel_options(state_key(), current_project.id, current_project)
+
 # — Add New Task Form
 with st.expander("📝 Add New Task", expanded=False):
     st.markdown('<div class="add-form-button">', unsafe_allow_html=True)
@@ -625,10 +997,7 @@ with st.expander("📝 Add New Task", expanded=False):
         # First: Task Type (auto‐populate Task Name)
         task_type = st.selectbox(
             "Task Type*",
-            [
-                "Survey", "Maintenance", "Weather", "Transit", "Delay",
-                "Sediment Sample", "Deployment", "Recovery", "Other"
-            ],
+            TASK_TYPES,
             index=0
         )
         if task_type != "Other":
@@ -652,19 +1021,16 @@ with st.expander("📝 Add New Task", expanded=False):
 
         col1, col2 = st.columns(2)
         with col1:
-            start_date_t = st.date_input("Start Date*", key="new_task_start")
+            start_date_t = st.date_input("Start Date*", value=today, key="new_task_start")
             end_date_t = st.date_input(
                 "End Date*",
-                value=datetime.date.today() + datetime.timedelta(days=1),
+                value=today + datetime.timedelta(days=1),
                 key="new_task_end"
             )
-            vessel_options = [("Unassigned", None)] + [
-                (v.name, v.id) for v in current_project.vessels
-            ]
-            sel_vessel = st.selectbox(
+            sel_vessel_id = st.selectbox(
                 "Assign to Vessel",
-                options=vessel_options,
-                format_func=lambda x: x[0],
+                options=vessel_option_ids,
+                format_func=vessel_label_by_id.__getitem__,
                 key="new_task_vessel"
             )
             pause_survey = st.checkbox("Pause Survey Operations", key="new_task_pause")
@@ -694,54 +1060,54 @@ with st.expander("📝 Add New Task", expanded=False):
                     task_type=chosen_type,
                     start_date=start_date_t,
                     end_date=end_date_t,
-                    vessel_id=sel_vessel[1],
+                    vessel_id=sel_vessel_id,
                     pause_survey=pause_survey
                 )
-                current_project.tasks.append(new_task)
+                current_project.put_task(new_task)
+                bump_state_version()
                 st.success(f"Task '{task_name.strip()}' added!")
     st.markdown('</div>', unsafe_allow_html=True)
 
 # — Display Existing Tasks
-for t in current_project.tasks:
-    with st.container():
-        d1, d2, d3 = st.columns([3, 1, 1])
-        assigned_name = next(
-            (v.name for v in current_project.vessels if v.id == t.vessel_id),
-            "Unassigned"
+page_tasks = paginate(list(current_project.tasks.values()), key="task_page")
+if page_tasks:
+    d1, d2, d3 = st.columns([3, 1, 1])
+    with d1:
+        sel_tid = st.selectbox(
+            "Task",
+            options=[t.id for t in page_tasks],
+            format_func=unique_labels({t.id: f"{t.name} ({t.start_date})" for t in page_tasks}).get,
+            key="task_action_select",
+            label_visibility="collapsed"
         )
-        with d1:
-            st.markdown(
-                f"""
-                <div class="card">
-                  <strong><i class="fas fa-tasks"></i> {t.name}</strong> ({t.task_type})<br>
-                  <small>{t.start_date} &rarr; {t.end_date} | Vessel: {assigned_name}</small><br>
-                  {("<small style='color:orange;'>⚠️ Pauses Survey</small>" if t.pause_survey else "")}
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        with d2:
-            if st.button("✏️ Edit", key=f"edit_t_{t.id}"):
-                st.session_state["editing_task"] = t.id
-        with d3:
-            if st.button("🗑️ Delete", key=f"del_t_{t.id}"):
-                current_project.tasks = [x for x in current_project.tasks if x.id != t.id]
-                st.success(f"Deleted task '{t.name}'.")
+    with d2:
+        if st.button("✏️ Edit", key="edit_task"):
+            st.session_state["editing_task"] = sel_tid
+    with d3:
+        if st.button("🗑️ Delete", key="delete_task"):
+            deleted_name = current_project.tasks[sel_tid].name
+            current_project.remove_task(sel_tid)
+            bump_state_version()
+            st.success(f"Deleted task '{deleted_name}'.")
+
+task_cards = task_cards_html(state_key(), current_project.id, current_project)
+if task_cards:
+    st.markdown(
+        "".join(task_cards[t.id] for t in page_tasks if t.id in task_cards),  # skips a just-deleted task
+        unsafe_allow_html=True
+    )
 
 # — Edit Task Expander
 if st.session_state.get("editing_task"):
     edit_tid = st.session_state["editing_task"]
-    to_edit_t = next((x for x in current_project.tasks if x.id == edit_tid), None)
+    to_edit_t = current_project.tasks.get(edit_tid)
     if to_edit_t is not None:
         with st.expander(f"✏️ Edit Task: {to_edit_t.name}", expanded=True):
             st.markdown('<div class="add-form-button">', unsafe_allow_html=True)
             with st.form(f"task_edit_form_{to_edit_t.id}"):
                 # First: Task Type
                 existing_task_type = to_edit_t.task_type
-                if existing_task_type in [
-                    "Survey", "Maintenance", "Weather", "Transit",
-                    "Delay", "Sediment Sample", "Deployment", "Recovery"
-                ]:
+                if existing_task_type in PRESET_TASK_TYPES:
                     key_type_default = existing_task_type
                     key_other_default = ""
                 else:
@@ -750,23 +1116,17 @@ if st.session_state.get("editing_task"):
 
                 e_type = st.selectbox(
                     "Task Type*",
-                    [
-                        "Survey", "Maintenance", "Weather", "Transit", "Delay",
-                        "Sediment Sample", "Deployment", "Recovery", "Other"
-                    ],
-                    index=[
-                        "Survey", "Maintenance", "Weather", "Transit", "Delay",
-                        "Sediment Sample", "Deployment", "Recovery", "Other"
-                    ].index(key_type_default),
+                    TASK_TYPES,
+                    index=TASK_TYPE_INDEX[key_type_default],
                     key=f"edit_type_{to_edit_t.id}"
                 )
                 if e_type != "Other":
                     default_edit_name = to_edit_t.name if to_edit_t.name else e_type
                 else:
-                    default_edit_name = to_edit_t.name if to_edit_t.name not in [
-                        "Survey", "Maintenance", "Weather", "Transit",
-                        "Delay", "Sediment Sample", "Deployment", "Recovery"
-                    ] else key_other_default
+                    default_edit_name = (
+                        to_edit_t.name if to_edit_t.name not in PRESET_TASK_TYPES
+                        else key_other_default
+                    )
 
                 e_name = st.text_input(
                     "Task Name*",
@@ -794,19 +1154,15 @@ if st.session_state.get("editing_task"):
                         value=to_edit_t.end_date,
                         key=f"edit_end_{to_edit_t.id}"
                     )
-                    vessel_options_edit = [("Unassigned", None)] + [
-                        (v.name, v.id) for v in current_project.vessels
-                    ]
-                    default_idx = 0
-                    for i, opt in enumerate(vessel_options_edit):
-                        if opt[1] == to_edit_t.vessel_id:
-                            default_idx = i
-                            break
-                    new_vessel = st.selectbox(
+                    default_idx = (
+                        vessel_option_ids.index(to_edit_t.vessel_id)
+                        if to_edit_t.vessel_id in vessel_label_by_id else 0
+                    )
+                    new_vessel_id = st.selectbox(
                         "Assign to Vessel",
-                        options=vessel_options_edit,
+                        options=vessel_option_ids,
                         index=default_idx,
-                        format_func=lambda x: x[0],
+                        format_func=vessel_label_by_id.__getitem__,
                         key=f"edit_vessel_{to_edit_t.id}"
                     )
                     new_pause = st.checkbox(
@@ -840,14 +1196,18 @@ if st.session_state.get("editing_task"):
                             task_type=chosen_ttype,
                             start_date=new_start,
                             end_date=new_end,
-                            vessel_id=new_vessel[1],
+                            vessel_id=new_vessel_id,
                             pause_survey=new_pause,
                             id=to_edit_t.id
                         )
-                        current_project.tasks = [
-                            x for x in current_project.tasks if x.id != to_edit_t.id
-                        ] + [updated_t]
-                        st.success(f"Task '{e_name.strip()}' updated!")
+                        # As with vessels, an unchanged submit leaves the task,
+                        # its list position and the state version untouched
+                        if updated_t.schedule_inputs() != to_edit_t.schedule_inputs():
+                            current_project.put_task(updated_t)
+                            bump_state_version()
+                            st.success(f"Task '{e_name.strip()}' updated!")
+                        else:
+                            st.info("No changes to save.")
                         st.session_state["editing_task"] = None
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -856,61 +1216,40 @@ if st.session_state.get("editing_task"):
 # ────────────────────────────────────────────────────────────────────────────────
 st.markdown('<div class="section-header">4) Data Management</div>', unsafe_allow_html=True)
 
+# Export only reads project state, so its widgets (filename box, export
+# buttons) rerun just this fragment rather than the whole app.
+@st.fragment
+def show_export_panel():
+    st.markdown("**Export All Projects**")
+    export_filename = st.text_input(
+        "Filename (no extension)", value="hydro_projects_export", key="export_name"
+    )
+    pretty_json = st.checkbox("Indent JSON (human-readable)", value=False, key="export_pretty")
+    if st.button("Export to JSON", key="export_json"):
+        raw = export_to_json(
+            state_key(), list(st.session_state.get("projects", {}).values()), pretty_json
+        )
+        st.download_button(
+            label="Download JSON",
+            data=raw,
+            file_name=f"{export_filename}.json",
+            mime="application/json"
+        )
+
+    if st.button("Export to Excel", key="export_excel"):
+        raw = export_to_json(state_key(), list(st.session_state.get("projects", {}).values()))
+        st.download_button(
+            label="Download Excel",
+            data=export_to_excel(raw),
+            file_name=f"{export_filename}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+
 with st.expander("💾 Export / Import Projects", expanded=False):
     ex_col1, ex_col2 = st.columns(2)
     with ex_col1:
-        st.markdown("**Export All Projects**")
-        export_filename = st.text_input(
-            "Filename (no extension)", value="hydro_projects_export", key="export_name"
-        )
-        if st.button("Export to JSON", key="export_json"):
-            data_out = {"projects": [p.to_dict() for p in st.session_state.get("projects", [])]}
-            raw = json.dumps(data_out, indent=2)
-            st.download_button(
-                label="Download JSON",
-                data=raw,
-                file_name=f"{export_filename}.json",
-                mime="application/json"
-            )
-
-        if st.button("Export to Excel", key="export_excel"):
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                proj_rows = []
-                for p in st.session_state.get("projects", []):
-                    proj_rows.append({
-                        "project_id": p.id,
-                        "name": p.name,
-                        "total_line_km": p.total_line_km,
-                        "infill_pct": p.infill_pct
-                    })
-                if proj_rows:
-                    pd.DataFrame(proj_rows).to_excel(writer, sheet_name="Projects", index=False)
-
-                vessel_rows = []
-                for p in st.session_state.get("projects", []):
-                    for v in p.vessels:
-                        vr = v.to_dict()
-                        vr["project_id"] = p.id
-                        vessel_rows.append(vr)
-                if vessel_rows:
-                    pd.DataFrame(vessel_rows).to_excel(writer, sheet_name="Vessels", index=False)
-
-                task_rows = []
-                for p in st.session_state.get("projects", []):
-                    for t in p.tasks:
-                        tr = t.to_dict()
-                        tr["project_id"] = p.id
-                        task_rows.append(tr)
-                if task_rows:
-                    pd.DataFrame(task_rows).to_excel(writer, sheet_name="Tasks", index=False)
-
-            st.download_button(
-                label="Download Excel",
-                data=output.getvalue(),
-                file_name=f"{export_filename}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        show_export_panel()
 
     with ex_col2:
         st.markdown("**Import Projects**")
@@ -920,73 +1259,97 @@ with st.expander("💾 Export / Import Projects", expanded=False):
         if uploaded_file is not None and st.button("Import Data", key="import_data"):
             try:
                 if uploaded_file.name.lower().endswith(".json"):
-                    raw = uploaded_file.read().decode("utf-8")
-                    data_in = json.loads(raw)
+                    data_in = json_loads(uploaded_file.read())
                     proj_dicts = data_in.get("projects", [])
                     new_projects = [Project.from_dict(d) for d in proj_dicts]
-                    st.session_state["projects"] = new_projects
+                    st.session_state["projects"] = {p.id: p for p in new_projects}
+                    # Imported ids can reuse ones already handed out this session,
+                    # so an open edit form must not carry over to the new data
+                    st.session_state["editing_vessel"] = None
+                    st.session_state["editing_task"] = None
                     if new_projects:
                         st.session_state["current_project_id"] = new_projects[0].id
                     else:
                         st.session_state["current_project_id"] = None
+                    bump_state_version()
                     st.success("Imported from JSON successfully!")
 
                 elif uploaded_file.name.lower().endswith(".xlsx"):
+                    import pandas as pd
                     xls = pd.ExcelFile(uploaded_file)
                     if "Projects" not in xls.sheet_names:
                         raise ValueError("Excel must contain a sheet named 'Projects'.")
-                    proj_df = xls.parse("Projects")
+                    proj_df = read_import_sheet(xls, "Projects")
+                    # itertuples yields lightweight namedtuples, not a Series per row
                     new_projects = []
-                    for idx, row in proj_df.iterrows():
+                    # Ids are str()-ed so a blank cell (NaN) still loads, as "nan"
+                    for row in proj_df.itertuples(index=False):
+                        pid = str(row.project_id)
+                        reserve_id(pid)
                         p = Project(
-                            name=row["name"],
-                            total_line_km=float(row["total_line_km"]),
-                            infill_pct=float(row["infill_pct"]),
-                            id=str(row["project_id"])
+                            name=row.name,
+                            total_line_km=float(row.total_line_km),
+                            infill_pct=float(row.infill_pct),
+                            id=pid
                         )
                         new_projects.append(p)
+                    # project_id → Project, so vessel/task rows attach in O(1)
+                    proj_by_id = {p.id: p for p in new_projects}
 
                     if "Vessels" in xls.sheet_names:
-                        ves_df = xls.parse("Vessels")
-                        for idx, row in ves_df.iterrows():
-                            pid = str(row["project_id"])
+                        ves_df = read_import_sheet(xls, "Vessels")
+                        # Dates are parsed once per column, not once per cell;
+                        # format="mixed" infers per cell, so a sheet mixing
+                        # "2025-01-02" and "02/03/2025" still loads
+                        ves_df["start_date"] = pd.to_datetime(ves_df["start_date"], format="mixed").dt.date
+                        for row in ves_df.itertuples(index=False):
+                            p = proj_by_id.get(str(row.project_id))
+                            if p is None:
+                                continue
                             v = Vessel.from_dict({
-                                "id": str(row["id"]),
-                                "name": row["name"],
-                                "vessel_km": row["vessel_km"],
-                                "start_date": row["start_date"],
-                                "transit_days": row["transit_days"],
-                                "weather_days": row["weather_days"],
-                                "maintenance_days": row["maintenance_days"]
+                                "id": str(row.id),
+                                "name": row.name,
+                                "vessel_km": row.vessel_km,
+                                "start_date": row.start_date,
+                                "transit_days": row.transit_days,
+                                "weather_days": row.weather_days,
+                                "maintenance_days": row.maintenance_days
                             })
-                            for p in new_projects:
-                                if p.id == pid:
-                                    p.vessels.append(v)
-                                    break
+                            p.vessels[v.id] = v
 
                     if "Tasks" in xls.sheet_names:
-                        task_df = xls.parse("Tasks")
-                        for idx, row in task_df.iterrows():
-                            pid = str(row["project_id"])
+                        task_df = read_import_sheet(xls, "Tasks")
+                        for col in ("start_date", "end_date"):
+                            task_df[col] = pd.to_datetime(task_df[col], format="mixed").dt.date
+                        # Blank vessel cells read back as NaN; unassigned is None
+                        task_df["vessel_id"] = task_df["vessel_id"].astype(object).where(
+                            task_df["vessel_id"].notna(), None
+                        )
+                        for row in task_df.itertuples(index=False):
+                            p = proj_by_id.get(str(row.project_id))
+                            if p is None:
+                                continue
                             t = Task.from_dict({
-                                "id": str(row["id"]),
-                                "name": row["name"],
-                                "task_type": row["task_type"],
-                                "start_date": row["start_date"],
-                                "end_date": row["end_date"],
-                                "vessel_id": row["vessel_id"],
-                                "pause_survey": bool(row["pause_survey"])
+                                "id": str(row.id),
+                                "name": row.name,
+                                "task_type": row.task_type,
+                                "start_date": row.start_date,
+                                "end_date": row.end_date,
+                                "vessel_id": row.vessel_id,
+                                "pause_survey": bool(row.pause_survey)
                             })
-                            for p in new_projects:
-                                if p.id == pid:
-                                    p.tasks.append(t)
-                                    break
+                            p.put_task(t)
 
-                    st.session_state["projects"] = new_projects
+                    st.session_state["projects"] = {p.id: p for p in new_projects}
+                    # Imported ids can reuse ones already handed out this session,
+                    # so an open edit form must not carry over to the new data
+                    st.session_state["editing_vessel"] = None
+                    st.session_state["editing_task"] = None
                     if new_projects:
                         st.session_state["current_project_id"] = new_projects[0].id
                     else:
                         st.session_state["current_project_id"] = None
+                    bump_state_version()
                     st.success("Imported from Excel successfully!")
                 else:
                     st.error("Unsupported file type. Please upload .json or .xlsx.")
@@ -1002,132 +1365,215 @@ proj = get_current_project()
 if proj is None:
     st.stop()
 
-def build_timeline_df(vessels: List[Vessel], tasks: List[Task]) -> pd.DataFrame:
+def vessel_timeline_rows(v: Vessel, pauses: List[Task]) -> List[tuple]:
+    # (Task, Start, Finish, Resource, Type) rows for one vessel: its survey
+    # window split around any pause tasks, which are assumed sorted by start.
+    # Dates stay datetime.date here; build_timeline_df converts them in bulk.
     rows = []
+    survey_end = v.end_date
+
+    cur_start = v.start_date
+    for t in pauses:
+        t_start = t.start_date
+        t_end   = t.end_date
+        if t_start > cur_start:
+            # ─── IMPORTANT: make sure Resource is exactly v.name every time ───
+            rows.append((f"Survey ► {v.name}", cur_start, t_start, v.name, "Survey"))
+        # ─── This must also be exactly v.name, not something like v.name + " " ───
+        rows.append((t.name, t_start, t_end, v.name, t.task_type))
+        cur_start = t_end
+
+    if cur_start < survey_end:
+        rows.append((f"Survey ► {v.name}", cur_start, survey_end, v.name, "Survey"))
+    return rows
+
+
+def build_timeline_df(
+    vessels: List[Vessel], tasks: List[Task], segment_cache: Optional[Dict] = None
+) -> "pd.DataFrame":
+    if not vessels and not tasks:
+        return empty_timeline_df()
+    import pandas as pd
+
+    # Accumulate one list per column and build the frame once at the end,
+    # rather than materialising a dict per row.
+    cols: Dict[str, list] = {"Task": [], "Start": [], "Finish": [], "Resource": [], "Type": []}
+
+    def add_row(task: str, start, finish, resource: str, ttype: str):
+        cols["Task"].append(task)
+        cols["Start"].append(start)
+        cols["Finish"].append(finish)
+        cols["Resource"].append(resource)
+        cols["Type"].append(ttype)
+
+    # One pass over the tasks: “pause” tasks grouped by vessel, plus the
+    # unassigned ones, instead of rescanning every task for each vessel
+    pauses_by_vessel: DefaultDict[str, List[Task]] = defaultdict(list)
+    unassigned: List[Task] = []
+    for t in tasks:
+        if t.vessel_id is None:
+            unassigned.append(t)
+        elif t.pause_survey:
+            pauses_by_vessel[t.vessel_id].append(t)
+
+    # segment_cache maps a vessel's content signature → its rows, so after an
+    # edit only the vessels whose schedule or pause tasks changed are re-split.
+    fresh_segments = {}
+    # Gantt lanes in project order (dict as an ordered set, so vessels that
+    # share a name share a lane), recorded here instead of re-deriving the
+    # order from the finished Resource column
+    lanes: Dict[str, None] = {}
     for v in vessels:
-        survey_start = pd.to_datetime(v.start_date)
-        survey_end   = pd.to_datetime(v.end_date)
-
-        # Any “pause” tasks for this vessel
-        pauses = sorted(
-            [t for t in tasks if (t.vessel_id == v.id and t.pause_survey)],
-            key=lambda t: pd.to_datetime(t.start_date)
+        # start_date is already a date, so sort on it directly
+        pauses = sorted(pauses_by_vessel.get(v.id, ()), key=lambda t: t.start_date)
+        signature = (
+            v.id, v.name, v.start_date, v.end_date,
+            tuple((t.id, t.name, t.task_type, t.start_date, t.end_date) for t in pauses)
         )
-
-        cur_start = survey_start
-        for t in pauses:
-            t_start = pd.to_datetime(t.start_date)
-            t_end   = pd.to_datetime(t.end_date)
-            if t_start > cur_start:
-                rows.append({
-                    "Task":    f"Survey ► {v.name}",
-                    "Start":   cur_start,
-                    "Finish":  t_start,
-                    # ─── IMPORTANT: make sure this is exactly v.name every time ───
-                    "Resource": v.name,
-                    "Type":    "Survey"
-                })
-            rows.append({
-                "Task":     t.name,
-                "Start":    t_start,
-                "Finish":   t_end,
-                # ─── This must also be exactly v.name, not something like v.name + " " ───
-                "Resource": v.name,
-                "Type":     t.task_type
-            })
-            cur_start = t_end
-
-        if cur_start < survey_end:
-            rows.append({
-                "Task":     f"Survey ► {v.name}",
-                "Start":    cur_start,
-                "Finish":   survey_end,
-                # ─── Again, “Resource”: v.name ───
-                "Resource": v.name,
-                "Type":     "Survey"
-            })
+        rows = segment_cache.get(signature) if segment_cache is not None else None
+        if rows is None:
+            rows = vessel_timeline_rows(v, pauses)
+        fresh_segments[signature] = rows
+        if rows:
+            lanes[v.name] = None
+        for row in rows:
+            add_row(*row)
+
+    if segment_cache is not None:
+        # Drop segments for vessels that were edited away or deleted
+        segment_cache.clear()
+        segment_cache.update(fresh_segments)
 
     # Unassigned tasks (no vessel_id)
-    for t in tasks:
-        if t.vessel_id is None:
-            rows.append({
-                "Task":     t.name,
-                "Start":    pd.to_datetime(t.start_date),
-                "Finish":   pd.to_datetime(t.end_date),
-                "Resource": "Unassigned",
-                "Type":     t.task_type
-            })
-
-    return pd.DataFrame(rows)
+    if unassigned:
+        lanes["Unassigned"] = None
+    for t in unassigned:
+        add_row(t.name, t.start_date, t.end_date, "Unassigned", t.task_type)
+
+    # Known types first, in COLOR_MAP order, then any custom “Other” types
+    custom_types = sorted(set(cols["Type"]).difference(TASK_TYPES))
+
+    # One constructor call with final dtypes; Resource/Type repeat heavily,
+    # so they go in dictionary-encoded rather than being converted afterwards.
+    # Each date column is converted with a single to_datetime call.
+    return pd.DataFrame({
+        "Task":     cols["Task"],
+        "Start":    pd.to_datetime(cols["Start"]),
+        "Finish":   pd.to_datetime(cols["Finish"]),
+        "Resource": pd.Categorical(cols["Resource"], categories=list(lanes)),
+        "Type":     pd.Categorical(cols["Type"], categories=[*TASK_TYPES, *custom_types]),
+    })
+
+
+def timeline_signature(vessels: List[Vessel], tasks: List[Task]) -> int:
+    # Hash of everything the Gantt draws. Unlike the state version it does not
+    # move when some other project (or a field the chart ignores) changes, so
+    # switching back to an untouched project still hits the cached figure.
+    return hash((
+        tuple((v.id, v.name, v.start_date, v.end_date) for v in vessels),
+        tuple(
+            (t.id, t.vessel_id, t.name, t.task_type, t.start_date, t.end_date, t.pause_survey)
+            for t in tasks
+        ),
+    ))
+
+
+# cache_resource hands back the same Figure object on a hit instead of
+# unpickling a fresh copy every rerun; callers must treat it as read-only.
+# Keyed on the content signature (an int, so cheap for Streamlit to hash);
+# the underscore args are not hashed at all.
+@st.cache_resource(ttl=600, max_entries=32, show_spinner=False)
+def build_timeline_fig(
+    signature: int, project_name: str,
+    _vessels: List[Vessel], _tasks: List[Task], _segment_cache: Dict
+) -> Optional["go.Figure"]:
+    timeline_df = build_timeline_df(_vessels, _tasks, _segment_cache)
+    if timeline_df.empty:
+        return None
 
-timeline_df = build_timeline_df(proj.vessels, proj.tasks)
+    # Plotly is only needed once there is a chart to draw (and only on a
+    # cache miss), so keep it off the app's cold-start import path.
+    import plotly.graph_objects as go
 
-if timeline_df.empty:
-    st.markdown(
-        '<span style="color:#FFFFFF;">No timeline data available for this project. '
-        'Add vessels/tasks above.</span>',
-        unsafe_allow_html=True
-    )
-else:
-    # Build a list of distinct Resource names (to get row order)
-    resources = timeline_df["Resource"].unique().tolist()
+    # Resource categories are the lanes in project order, so a row's
+    # category code is its lane index (0 at top)
+    resources = timeline_df["Resource"].cat.categories.tolist()
     n_rows    = len(resources)
-    # Map each Resource → a Y‐index (0 at top)
-    row_positions = {res: idx for idx, res in enumerate(resources)}
 
     fig = go.Figure()
 
-    # (Optional) Draw alternating “lane” backgrounds for each row
-    for res, idx in row_positions.items():
-        lane_color = "#F2F2F2" if (idx % 2 == 0) else "#FFFFFF"
-        fig.add_shape(
+    # Alternating “lane” backgrounds for each row plus a dashed red “Today”
+    # line, handed to the layout as one list (add_shape re-validates the
+    # layout on every call)
+    # Endpoints are ISO strings, like the bar dates below
+    lane_x0 = (timeline_df["Start"].min() - GANTT_DATE_PAD).strftime("%Y-%m-%d")
+    lane_x1 = (timeline_df["Finish"].max() + GANTT_DATE_PAD).strftime("%Y-%m-%d")
+    shapes = [
+        dict(
             type="rect",
             xref="x", yref="y",
-            x0=timeline_df["Start"].min() - pd.Timedelta(days=3),
-            x1=timeline_df["Finish"].max()  + pd.Timedelta(days=3),
+            x0=lane_x0, x1=lane_x1,
             y0=idx - 0.4, y1=idx + 0.4,
-            fillcolor=lane_color,
-            line_width=0,
+            fillcolor="#F2F2F2" if (idx % 2 == 0) else "#FFFFFF",
+            line=dict(width=0),
             layer="below"
         )
-
-    # Draw a “Today” line in dashed red
-    today_date = pd.to_datetime(datetime.date.today())
-    fig.add_shape(
+        for idx in range(n_rows)
+    ]
+    today_date = datetime.date.today().isoformat()
+    shapes.append(dict(
         type="line",
         x0=today_date, x1=today_date,
         yref="paper", y0=0, y1=1,
         line=dict(color="red", width=2, dash="dash"),
         layer="above"
-    )
-
-    # Add one horizontal Bar for each row in timeline_df
-    seen_types = set()
-    for _, row in timeline_df.iterrows():
-        y_idx     = row_positions[row["Resource"]]
-        bar_color = COLOR_MAP.get(row["Type"], COLOR_MAP["Other"])
-        bar_name  = row["Type"]
-
-        # Only show the legend once per Type
-        first_time = (bar_name not in seen_types)
-        if first_time:
-            seen_types.add(bar_name)
-
+    ))
+    fig.update_layout(shapes=shapes)
+
+    # One horizontal Bar trace per Type (not per row), so the figure carries
+    # a handful of traces and the legend gets one entry per Type for free.
+    # Categories are TASK_TYPES followed by custom types, which all draw in
+    # the “Other” color, so the code → color table needs no dict lookups
+    categories = timeline_df["Type"].cat.categories
+    n_custom = len(categories) - len(TASK_TYPES)
+    type_colors = TYPE_COLORS + (COLOR_MAP["Other"],) * n_custom
+
+    tasks_col  = timeline_df["Task"].tolist()
+    # Dates go into the (cached) figure as ISO strings, converted in one
+    # vectorized call. plotly_chart re-encodes the figure on every rerun,
+    # and plain str lists take Plotly's JSON fast path, where Timestamp
+    # objects would be converted one by one each time.
+    starts     = timeline_df["Start"].dt.strftime("%Y-%m-%d").tolist()
+    finishes   = timeline_df["Finish"].dt.strftime("%Y-%m-%d").tolist()
+    # invert Y so 0 is at top
+    ys = [n_rows - 1 - code for code in timeline_df["Resource"].cat.codes.tolist()]
+
+    # Row indices per Type code, in order of first appearance (legend order)
+    rows_by_code: Dict[int, List[int]] = {}
+    for i, code in enumerate(timeline_df["Type"].cat.codes.tolist()):
+        rows_by_code.setdefault(code, []).append(i)
+
+    # Each in-bar label is its own SVG text node that Plotly has to measure
+    # and fit; past a few hundred bars they are unreadable anyway, so dense
+    # charts leave the names to the hover box.
+    show_labels = len(tasks_col) <= GANTT_LABEL_MAX_BARS
+
+    for code, idxs in rows_by_code.items():
+        ttype = categories[code]
         fig.add_trace(
             go.Bar(
-                x=[row["Finish"]],           # bar “end” date
-                base=[row["Start"]],         # bar “start” date
-                y=[n_rows - 1 - y_idx],      # invert Y so 0 is at top
+                x=[finishes[i] for i in idxs],   # bar “end” dates
+                base=[starts[i] for i in idxs],  # bar “start” dates
+                y=[ys[i] for i in idxs],
                 orientation="h",
-                marker_color=bar_color,
+                marker_color=type_colors[code],
                 marker_line_width=0,
                 width=0.5,
-                name=bar_name,
-                showlegend=first_time,
+                name=ttype,
 
-                # Label the bar with its Task name, inside the bar
-                text=[row["Task"]],
-                textposition="inside",
+                # Label each bar with its Task name, inside the bar
+                text=[tasks_col[i] for i in idxs] if show_labels else None,
+                textposition="inside" if show_labels else "none",
                 insidetextanchor="middle",
                 textfont=dict(color="#FFFFFF", size=14, family="Arial"),
 
@@ -1137,14 +1583,16 @@ else:
                     "Start: %{base|%Y-%m-%d}<br>"
                     "Finish: %{x|%Y-%m-%d}<extra></extra>"
                 ),
-                customdata=[[row["Task"], row["Type"]]]
+                customdata=[[tasks_col[i], ttype] for i in idxs]
             )
         )
 
     # Layout adjustments: keep a white plot‐area, dark outer background,
     # push the legend above the bars, and force the x‐axis to be a date axis.
     fig.update_layout(
-        height=max(400, 80 * n_rows),
+        height=min(max(400, 80 * n_rows), GANTT_MAX_HEIGHT),
+        # Bars sharing a lane sit on its center line rather than side by side
+        barmode="overlay",
         margin=dict(l=10, r=10, t=120, b=50),
         plot_bgcolor="#FFFFFF",
         paper_bgcolor="rgba(0,0,0,0)",
@@ -1163,7 +1611,7 @@ else:
         ),
 
         title=dict(
-            text=f"Gantt Chart ► {proj.name}",
+            text=f"Gantt Chart ► {project_name}",
             font_size=22,
             font_color="#0B1D3A",
             x=0.01
@@ -1193,5 +1641,32 @@ else:
         gridcolor="rgba(200,200,200,0.2)"
     )
 
-    # Finally render it full‐width
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+# Every rerun that reaches here redraws the chart, but the figure is cached on
+# its content signature, so a rerun that leaves the schedule alone costs only
+# the signature hash plus the plotly_chart encode.
+def show_timeline(proj: Project):
+    gantt_vessels = list(proj.vessels.values())
+    gantt_tasks = list(proj.tasks.values())
+    fig = build_timeline_fig(
+        timeline_signature(gantt_vessels, gantt_tasks),
+        proj.name,
+        gantt_vessels,
+        gantt_tasks,
+        st.session_state["timeline_segments"],
+    )
+
+    if fig is None:
+        st.markdown(
+            '<span style="color:#FFFFFF;">No timeline data available for this project. '
+            'Add vessels/tasks above.</span>',
+            unsafe_allow_html=True
+        )
+    else:
+        # Finally render it full‐width
+        st.plotly_chart(fig, use_container_width=True)
+
+
+show_timeline(proj)
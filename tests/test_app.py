@@ -0,0 +1,153 @@
+import datetime
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+import openpyxl
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "Hydrographic_Planning_v0.py")
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def click(at, label):
+    next(b for b in at.button if b.label == label).click()
+    at.run()
+    assert not at.exception
+
+
+def new_app():
+    # App with one empty project selected
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.text_input[0].input("Gulf")
+    at.number_input[0].set_value(100)
+    click(at, "Create Project")
+    at.run()
+    return at
+
+
+def current_project(at):
+    return at.session_state["projects"][at.session_state["current_project_id"]]
+
+
+def add_vessel(at, name, km):
+    next(w for w in at.text_input if w.label == "Vessel Name*").input(name)
+    next(w for w in at.number_input if w.label == "Line Km for this Vessel*").set_value(km)
+    click(at, "Add Vessel")
+    return list(current_project(at).vessels)[-1]
+
+
+def add_task(at, name, vessel_id, pause=False, days=(1, 2)):
+    today = datetime.date.today()
+    next(w for w in at.text_input if w.label == "Task Name*").input(name)
+    at.date_input(key="new_task_start").set_value(today + datetime.timedelta(days=days[0]))
+    at.date_input(key="new_task_end").set_value(today + datetime.timedelta(days=days[1]))
+    at.selectbox(key="new_task_vessel").set_value(vessel_id)
+    checkbox = at.checkbox(key="new_task_pause")
+    checkbox.check() if pause else checkbox.uncheck()
+    click(at, "Add Task")
+    return list(current_project(at).tasks)[-1]
+
+
+def test_task_keeps_chosen_vessel_when_names_repeat():
+    at = new_app()
+    first_id = add_vessel(at, "Orca", 100)
+    second_id = add_vessel(at, "Orca", 200)
+
+    picker = at.selectbox(key="new_task_vessel")
+    # options are the rendered labels
+    assert len(set(picker.options)) == len(picker.options)
+
+    task_id = add_task(at, "Survey", first_id)
+    assert current_project(at).tasks[task_id].vessel_id == first_id != second_id
+
+    # The action selector labels each vessel the same way as the picker
+    assert at.selectbox(key="vessel_action_select").options == picker.options[1:]
+
+
+def test_task_action_targets_chosen_task_when_labels_repeat():
+    at = new_app()
+    first_id = add_task(at, "Survey", None)
+    second_id = add_task(at, "Survey", None)
+
+    selector = at.selectbox(key="task_action_select")
+    assert len(set(selector.options)) == len(selector.options)
+
+    selector.set_value(first_id)
+    at.button(key="delete_task").click()
+    at.run()
+    assert list(current_project(at).tasks) == [second_id]
+
+
+def test_excel_export_import_round_trip():
+    at = new_app()
+    numeric_name_id = add_vessel(at, "2024", 100)
+    orca_id = add_vessel(at, "Orca", 200)
+    add_task(at, "Weather hold", orca_id, pause=True)
+    add_task(at, "Sampling", None, days=(3, 4))
+    exported = current_project(at)
+
+    # Capture the workbook handed to the download button
+    downloads = {}
+    real_download = st.download_button
+
+    def capture(label, data, *args, **kwargs):
+        downloads[kwargs.get("mime")] = data
+        return real_download(label, data, *args, **kwargs)
+
+    with mock.patch.object(st, "download_button", capture):
+        click(at, "Export to Excel")
+    wb = openpyxl.load_workbook(BytesIO(downloads[XLSX_MIME]))
+
+    # A second project row whose id cell was left blank
+    wb["Projects"].append([None, "Loose", 10.0, 0.0])
+    edited = BytesIO()
+    wb.save(edited)
+
+    at.file_uploader[0].set_value(("plan.xlsx", edited.getvalue(), XLSX_MIME))
+    at.run()
+    click(at, "Import Data")
+    assert [s.value for s in at.success] == ["Imported from Excel successfully!"]
+
+    projects = list(at.session_state["projects"].values())
+    assert [p.name for p in projects] == ["Gulf", "Loose"]
+    imported = projects[0]
+    assert [v.to_dict() for v in imported.vessels.values()] == [
+        v.to_dict() for v in exported.vessels.values()
+    ]
+    assert [t.to_dict() for t in imported.tasks.values()] == [
+        t.to_dict() for t in exported.tasks.values()
+    ]
+    # A name that looks like a number stays text, and unassigned stays None
+    assert imported.vessels[numeric_name_id].name == "2024"
+    assert [t.vessel_id for t in imported.tasks.values()] == [orca_id, None]
+    assert not projects[1].vessels and not projects[1].tasks
+
+
+def test_deleting_vessel_removes_only_its_tasks():
+    at = new_app()
+    keep_id = add_vessel(at, "Keep", 100)
+    drop_id = add_vessel(at, "Drop", 100)
+    kept_task = add_task(at, "On keep", keep_id)
+    dropped_task = add_task(at, "On drop", drop_id)
+    moved_task = add_task(at, "Moved off drop", drop_id)
+    loose_task = add_task(at, "Unassigned", None)
+
+    # Reassign one task away from the vessel before deleting it
+    at.selectbox(key="task_action_select").set_value(moved_task)
+    at.button(key="edit_task").click()
+    at.run()
+    at.selectbox(key=f"edit_vessel_{moved_task}").set_value(keep_id)
+    click(at, "Update Task")
+
+    at.selectbox(key="vessel_action_select").set_value(drop_id)
+    at.button(key="delete_vessel").click()
+    at.run()
+    assert not at.exception
+
+    proj = current_project(at)
+    assert list(proj.vessels) == [keep_id]
+    assert list(proj.tasks) == [kept_task, moved_task, loose_task]
+    assert dropped_task not in proj.tasks